@@ -8,18 +8,26 @@ from core.preamble_data import PREAMBLE_TEXT, PREAMBLE_TERMS
 # Consolidating the LLM client imports for clarity
 from core.llm_client import (
     explain_term_with_llm, 
+    explain_terms_batch,
     fetch_country_preamble, 
-    explain_preamble_global
+    explain_preamble_global,
+    get_llm_queue,
+    get_token_usage,
 )
+from core.similarity import compare_with_india
+from core import profiler
 from core.ui_components import (
     render_header,
     render_preamble_card,
     render_term_buttons,
+    render_batch_buttons,
     render_explanation_card,
     render_history_panel,
     render_footer,
     render_global_preamble_card,
     render_global_explanation_card,
+    render_comparison_card,
+    render_queue_status,
 )
 
 
@@ -33,12 +41,15 @@ def init_session_state():
         st.session_state["history"] = []
     if "selected_term" not in st.session_state:
         st.session_state["selected_term"] = None
+    if "batch_scope" not in st.session_state: # "All" or a PREAMBLE_TERMS category
+        st.session_state["batch_scope"] = None
     if "global_preamble_data" not in st.session_state: # Stores the fetched preamble, if any
         st.session_state["global_preamble_data"] = None
     if "country_input" not in st.session_state:
         st.session_state["country_input"] = ""
 
 
+@profiler.profiled
 def handle_global_fetch(country_name):
     """Handles the full lifecycle of fetching and analyzing a global preamble."""
     
@@ -62,31 +73,45 @@ def handle_global_fetch(country_name):
         if "Gemini" in source or source == "AI-Generated":
             st.info(f"Preamble content: {message}") # Changed to st.info for a positive result
         
-        # 2. Store Preamble Data
+        # 2. Store Preamble Data (the India comparison is computed locally)
+        include_comparison = st.session_state.get("compare_india", False)
+        fast_mode = st.session_state.get("fast_comparison", False)
+        comparison = (
+            compare_with_india({country_name: preamble_text})[country_name]
+            if include_comparison else None
+        )
+
         st.session_state["global_preamble_data"] = {
             "country": country_name,
             "preamble_text": preamble_text,
             "fetch_source": source,
             "fetch_message": message,
             "explanation": None, # Placeholder
-            "compare_india": st.session_state.get("compare_india", False),
+            "compare_india": include_comparison,
+            "fast_mode": fast_mode,
+            # The LLM only narrates the comparison outside fast mode
+            "llm_comparison": include_comparison and not fast_mode,
+            "comparison": comparison,
         }
     
     # Trigger explanation automatically after fetch
-    st.rerun() # UPDATED: Changed st.experimental_rerun() to st.rerun()
+    profiler.rerun() # Records the rerun when profiling, then calls st.rerun()
 
 
+@profiler.profiled
 def handle_global_explain(preamble_data):
     """Handles the LLM analysis of the fetched global preamble."""
     country_name = preamble_data['country']
     preamble_text = preamble_data['preamble_text']
-    include_comparison = st.session_state.get("compare_india", False)
+    include_comparison = preamble_data['compare_india']
     
     with st.spinner(f"Analyzing the Preamble of {country_name} with AI..."):
         explanation = explain_preamble_global(
             country_name=country_name,
             preamble_text=preamble_text,
             include_comparison=include_comparison,
+            comparison=preamble_data.get("comparison"),
+            fast_mode=preamble_data['fast_mode'],
         )
         
     # Update global_preamble_data with explanation
@@ -99,7 +124,7 @@ def handle_global_explain(preamble_data):
             "type": "global",
             "country": country_name,
             "preamble_snippet": preamble_text[:100] + "...",
-            "compare": include_comparison,
+            "compare": preamble_data['llm_comparison'],
             "timestamp": datetime.now().strftime("%H:%M:%S"),
         },
     )
@@ -118,139 +143,215 @@ def main():
         initial_sidebar_state="expanded", 
     )
 
-    init_session_state()
-
-    render_header()
-
-    # --- Layout Setup ---
-    col_left, col_right = st.columns([2, 1])
-
-    with col_right:
-        # History Panel (Sidebar Look)
-        render_history_panel(st.session_state["history"])
-
-    with col_left:
-        # ----------------------------------------------------------------
-        # SECTION 1: INDIAN PREAMBLE EXPLORER (Existing Logic)
-        # ----------------------------------------------------------------
-        st.markdown("## 🇮🇳 Indian Preamble Explorer") # Simplified heading
-        render_preamble_card(PREAMBLE_TEXT)
-
-        st.markdown("#### Configure Explanation")
-
-        # Hindi toggle + depth slider for Indian Preamble
-        c1, c2 = st.columns([1, 1])
-        with c1:
-            explain_in_hindi = st.toggle("Explain in Hindi 🇮🇳", value=False)
-        with c2:
-            depth = st.slider(
-                "Explanation depth",
-                min_value=1,
-                max_value=3,
-                value=2,
-                key="indian_depth",
-                help="1 = very short, 3 = more detailed",
-            )
-
-        selected_term = render_term_buttons(PREAMBLE_TERMS)
-
-        if selected_term:
-            st.session_state["selected_term"] = selected_term
-            # Reset global state when switching back to Indian Preamble
-            st.session_state["global_preamble_data"] = None
-
-        active_term = st.session_state.get("selected_term")
-
-        if active_term and not st.session_state.get("global_preamble_data"):
-            # Ensure we only run for Indian Preamble if global data is not active
-            explanation = explain_term_with_llm(
-                term=active_term["label"],
-                category=active_term["category"],
-                explain_in_hindi=explain_in_hindi,
-                depth=depth,
-            )
-
-            # Save to history
-            if st.session_state.get("selected_term") is not None:
-                st.session_state["history"].insert(
-                    0,
-                    {
-                        "type": "indian",
-                        "term": active_term["label"],
-                        "category": active_term["category"],
-                        "explanation": explanation,
-                        "hindi": explain_in_hindi,
-                        "timestamp": datetime.now().strftime("%H:%M:%S"),
-                    },
-                )
+    profiler.start_run()
+
+    try:
+        init_session_state()
+
+        render_header()
+
+        # --- Layout Setup ---
+        col_left, col_right = st.columns([2, 1])
+
+        with col_right:
+            # History Panel (Sidebar Look)
+            render_history_panel(st.session_state["history"])
+
+        with col_left:
+            with profiler.section("indian_explorer"):
+                # ----------------------------------------------------------------
+                # SECTION 1: INDIAN PREAMBLE EXPLORER (Existing Logic)
+                # ----------------------------------------------------------------
+                st.markdown("## 🇮🇳 Indian Preamble Explorer") # Simplified heading
+                render_preamble_card(PREAMBLE_TEXT)
+
+                st.markdown("#### Configure Explanation")
+
+                # Hindi toggle + depth slider for Indian Preamble
+                c1, c2 = st.columns([1, 1])
+                with c1:
+                    explain_in_hindi = st.toggle("Explain in Hindi 🇮🇳", value=False)
+                with c2:
+                    depth = st.slider(
+                        "Explanation depth",
+                        min_value=1,
+                        max_value=3,
+                        value=2,
+                        key="indian_depth",
+                        help="1 = very short, 3 = more detailed",
+                    )
+
+                selected_term = render_term_buttons(PREAMBLE_TERMS)
+                selected_batch = render_batch_buttons(PREAMBLE_TERMS)
+
+                if selected_term:
+                    st.session_state["selected_term"] = selected_term
+                    st.session_state["batch_scope"] = None
+                    # Reset global state when switching back to Indian Preamble
+                    st.session_state["global_preamble_data"] = None
+
+                if selected_batch:
+                    st.session_state["batch_scope"] = selected_batch
+                    st.session_state["selected_term"] = None
+                    st.session_state["global_preamble_data"] = None
+
+                active_term = st.session_state.get("selected_term")
+
+                if active_term and not st.session_state.get("global_preamble_data"):
+                    # Ensure we only run for Indian Preamble if global data is not active
+                    with profiler.section("indian_llm"):
+                        explanation = explain_term_with_llm(
+                            term=active_term["label"],
+                            category=active_term["category"],
+                            explain_in_hindi=explain_in_hindi,
+                            depth=depth,
+                        )
+
+                    # Save to history
+                    if st.session_state.get("selected_term") is not None:
+                        st.session_state["history"].insert(
+                            0,
+                            {
+                                "type": "indian",
+                                "term": active_term["label"],
+                                "category": active_term["category"],
+                                "explanation": explanation,
+                                "hindi": explain_in_hindi,
+                                "timestamp": datetime.now().strftime("%H:%M:%S"),
+                            },
+                        )
             
-            # Render Indian Explanation
-            render_explanation_card(
-                term=active_term["label"],
-                category=active_term["category"],
-                explanation=explanation,
-                explain_in_hindi=explain_in_hindi,
-            )
-
-        st.markdown("---")
-
-
-        # ----------------------------------------------------------------
-        # SECTION 2: WORLD PREAMBLE EXPLORER (NEW LOGIC)
-        # ----------------------------------------------------------------
-        st.markdown("## 🌍 World Preamble Explorer") # Simplified heading
+                    # Render Indian Explanation
+                    render_explanation_card(
+                        term=active_term["label"],
+                        category=active_term["category"],
+                        explanation=explanation,
+                        explain_in_hindi=explain_in_hindi,
+                    )
+
+                batch_scope = st.session_state.get("batch_scope")
+
+                if batch_scope and not st.session_state.get("global_preamble_data"):
+                    # "Explain all values" mode: one LLM call for the whole category
+                    batch_terms = [
+                        t for t in PREAMBLE_TERMS
+                        if batch_scope == "All" or t["category"] == batch_scope
+                    ]
+                    with profiler.section("batch_llm"):
+                        explanations = explain_terms_batch(
+                            terms=batch_terms,
+                            explain_in_hindi=explain_in_hindi,
+                            depth=depth,
+                        )
+
+                    for term in batch_terms:
+                        # Save to history only when the batch was requested in this run
+                        if selected_batch:
+                            st.session_state["history"].insert(
+                                0,
+                                {
+                                    "type": "indian",
+                                    "term": term["label"],
+                                    "category": term["category"],
+                                    "explanation": explanations[term["label"]],
+                                    "hindi": explain_in_hindi,
+                                    "timestamp": datetime.now().strftime("%H:%M:%S"),
+                                },
+                            )
+
+                        render_explanation_card(
+                            term=term["label"],
+                            category=term["category"],
+                            explanation=explanations[term["label"]],
+                            explain_in_hindi=explain_in_hindi,
+                        )
+
+                st.markdown("---")
+
+
+            with profiler.section("world_explorer"):
+                # ----------------------------------------------------------------
+                # SECTION 2: WORLD PREAMBLE EXPLORER (NEW LOGIC)
+                # ----------------------------------------------------------------
+                st.markdown("## 🌍 World Preamble Explorer") # Simplified heading
         
-        # Input and Button in a single form to handle the click event
-        with st.form(key="global_fetch_form"):
-            country_input = st.text_input(
-                "Enter country name to generate its Constitutional Preamble",
-                key="country_input_text",
-                placeholder="e.g., Germany, USA, South Africa"
-            )
+                # Input and Button in a single form to handle the click event
+                with st.form(key="global_fetch_form"):
+                    country_input = st.text_input(
+                        "Enter country name to generate its Constitutional Preamble",
+                        key="country_input_text",
+                        placeholder="e.g., Germany, USA, South Africa"
+                    )
             
-            st.toggle(
-                "Include comparison with Indian Preamble",
-                key="compare_india",
-                value=True,
-                help="The AI will add a section comparing the generated Preamble with India's.",
-            )
+                    st.toggle(
+                        "Include comparison with Indian Preamble",
+                        key="compare_india",
+                        value=True,
+                        help="The AI will add a section comparing the generated Preamble with India's.",
+                    )
+
+                    st.toggle(
+                        "Fast comparison (local only, no AI narration)",
+                        key="fast_comparison",
+                        value=False,
+                        help="Shows the locally computed comparison with India without asking the AI to narrate it.",
+                    )
             
-            submitted = st.form_submit_button("Generate & Analyze Preamble 🔎") # Updated button text
+                    submitted = st.form_submit_button("Generate & Analyze Preamble 🔎") # Updated button text
 
-            if submitted:
-                # Clear Indian Preamble term state
-                st.session_state["selected_term"] = None 
-                handle_global_fetch(country_input.strip())
+                    if submitted:
+                        # Clear Indian Preamble term state
+                        st.session_state["selected_term"] = None 
+                        st.session_state["batch_scope"] = None
+                        handle_global_fetch(country_input.strip())
         
         
-        # Display the fetched preamble and explanation
-        global_data = st.session_state.get("global_preamble_data")
+                # Display the fetched preamble and explanation
+                global_data = st.session_state.get("global_preamble_data")
         
-        if global_data:
-            # 1. Render the fetched preamble
-            render_global_preamble_card(
-                country=global_data['country'],
-                preamble=global_data['preamble_text'],
-                source=global_data['fetch_source'],
-            )
-
-            # 2. Check if explanation has been run, if not, run it.
-            if global_data.get("explanation") is None:
-                # Note: This is a re-run but triggered within a handler, so it works.
-                handle_global_explain(global_data)
-                # We need to manually re-run here to show the new explanation state
-                st.rerun() # UPDATED: Changed st.experimental_rerun() to st.rerun()
+                if global_data:
+                    # 1. Render the fetched preamble
+                    render_global_preamble_card(
+                        country=global_data['country'],
+                        preamble=global_data['preamble_text'],
+                        source=global_data['fetch_source'],
+                    )
+
+                    # 2. Check if explanation has been run, if not, run it.
+                    if global_data.get("explanation") is None:
+                        # Note: This is a re-run but triggered within a handler, so it works.
+                        handle_global_explain(global_data)
+                        # We need to manually re-run here to show the new explanation state
+                        profiler.rerun() # Records the rerun when profiling, then calls st.rerun()
             
-            # 3. Render the explanation
-            if global_data.get("explanation"):
-                render_global_explanation_card(
-                    country=global_data['country'],
-                    explanation=global_data['explanation'],
-                    include_comparison=global_data['compare_india'],
-                )
-
-
-    render_footer()
+                    # 3. Render the locally computed India comparison
+                    if global_data.get("comparison"):
+                        render_comparison_card(
+                            country=global_data['country'],
+                            comparison=global_data['comparison'],
+                        )
+
+                    # 4. Render the explanation
+                    if global_data.get("explanation"):
+                        render_global_explanation_card(
+                            country=global_data['country'],
+                            explanation=global_data['explanation'],
+                            include_comparison=global_data['llm_comparison'],
+                        )
+
+
+        if profiler.profiling_enabled():
+            # Drawn after the explorers so it includes this run's LLM calls
+            with col_right:
+                render_queue_status(get_llm_queue().metrics(), get_token_usage().summary())
+
+        render_footer()
+
+        profiler.finish_run()
+    except BaseException as exc:
+        # Flush the trace of runs ended by an error or interrupted mid-run
+        profiler.abort_run(exc)
+        raise
 
 
 if __name__ == "__main__":
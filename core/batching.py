@@ -0,0 +1,47 @@
+import re
+from typing import Dict, List
+
+from .prompts import PROMPT_TEMPLATE_BATCH_ENGLISH, PROMPT_TEMPLATE_BATCH_HINDI
+
+# =====================================================================
+# BATCHED PROMPT BUILDING & RESPONSE SPLITTING
+#
+# Several Indian Preamble terms are explained in one LLM call; the answer
+# uses one "### TERM: <term>" heading per term and is split back here.
+# =====================================================================
+
+# Tolerates missing/extra "#" and bold markers, e.g. "**TERM: Justice**"
+_BATCH_HEADING_RE = re.compile(r"^[ \t]*(?:#{1,6}[ \t]*)?\**[ \t]*TERM:(.+)$", re.MULTILINE | re.IGNORECASE)
+
+
+def build_batch_prompt(terms: List[Dict[str, str]], depth: int, explain_in_hindi: bool) -> str:
+    term_list = "\n".join(f"- {t['label']} (category: {t['category']})" for t in terms)
+    base_prompt = PROMPT_TEMPLATE_BATCH_ENGLISH.format(term_list=term_list, depth=depth)
+
+    if explain_in_hindi:
+        return base_prompt + "\n\n" + PROMPT_TEMPLATE_BATCH_HINDI
+
+    return base_prompt
+
+
+def split_batch_response(text: str, labels: List[str]) -> Dict[str, str]:
+    """
+    Splits a batched answer on its "### TERM: <term>" headings, keyed by label.
+    A label whose heading appears more than once (e.g. repeated for the Hindi
+    part) gets all of its sections, in order. Labels without a heading are
+    left out; unknown headings end the previous section and are dropped.
+    """
+    by_lower = {label.lower(): label for label in labels}
+    matches = list(_BATCH_HEADING_RE.finditer(text))
+
+    parts: Dict[str, List[str]] = {}
+    for i, match in enumerate(matches):
+        label = by_lower.get(match.group(1).strip(" \t*").lower())
+        if label is None:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if body:
+            parts.setdefault(label, []).append(body)
+
+    return {label: "\n\n".join(bodies) for label, bodies in parts.items()}
@@ -1,14 +1,26 @@
+import logging
+import threading
 import streamlit as st
-import google.generativeai as genai
-from typing import Dict, Tuple
+from google import genai
+from google.genai import types
+from typing import Dict, List, Tuple
 
 from .prompts import (
     BASE_SYSTEM_INSTRUCTIONS,
     PROMPT_TEMPLATE_ENGLISH,
     PROMPT_TEMPLATE_HINDI,
+    GLOBAL_SYSTEM_INSTRUCTIONS,
     PROMPT_TEMPLATE_GLOBAL_EXPLAINER,
     PROMPT_TEMPLATE_COMPARISON_SECTION,
+    PREAMBLE_WRITER_SYSTEM_INSTRUCTIONS,
 )
+from .similarity import compare_with_india, format_comparison_facts
+from .llm_queue import LLMWorkQueue, PRIORITY_FOREGROUND, PRIORITY_BATCH
+from .batching import build_batch_prompt, split_batch_response
+from . import profiler
+from .session import get_session_id
+
+logger = logging.getLogger(__name__)
 
 # =====================================================================
 # GEMINI API KEY CONFIGURATION (5-Key Rotation)
@@ -20,44 +32,230 @@ try:
     GEMINI_KEYS = st.secrets["GEMINI_KEYS"]
 except Exception:
     GEMINI_KEYS = []
+
+# One client per key: calls on different worker threads each carry their
+# own key instead of sharing process-global configuration.
+_clients_lock = threading.Lock()
+_clients: Dict[str, genai.Client] = {}
+
+
+def _get_client(key: str) -> genai.Client:
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = genai.Client(api_key=key)
+            _clients[key] = client
+        return client
+
+
+# =====================================================================
+# SYSTEM INSTRUCTIONS & TOKEN MEASUREMENT
+#
+# The static prompt prefixes are sent as the model's system_instruction.
+# They are all well below the minimum size for explicit context caching
+# (~1024 tokens on Flash), so reuse relies on the model's implicit caching,
+# which usage_metadata reports as cached_content_token_count.
+# =====================================================================
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Token count of each system instruction, counted once per instruction
+_instruction_tokens_lock = threading.Lock()
+_instruction_tokens: Dict[str, int] = {}
+
+
+def _build_config(system_instruction: str | None) -> types.GenerateContentConfig | None:
+    if not system_instruction:
+        return None
+    return types.GenerateContentConfig(system_instruction=system_instruction)
+
+
+def _count_instruction_tokens(client: genai.Client, system_instruction: str | None) -> int | None:
+    """Memoized token count of a system instruction (one count_tokens call per constant)."""
+    if not system_instruction:
+        return 0
+
+    with _instruction_tokens_lock:
+        if system_instruction in _instruction_tokens:
+            return _instruction_tokens[system_instruction]
+
+    # Counted outside the lock; a rare duplicate count is harmless
+    try:
+        tokens = client.models.count_tokens(model=GEMINI_MODEL, contents=system_instruction).total_tokens
+    except Exception:
+        # The measurement is best-effort and must never fail the request
+        return None
+
+    with _instruction_tokens_lock:
+        _instruction_tokens[system_instruction] = tokens
+    return tokens
+
+
+class TokenUsageStats:
+    """
+    Thread-safe running totals of input tokens per request kind.
+
+    prompt_token_count already includes the system_instruction, and the old
+    layout sent the same text concatenated into the prompt, so it is also the
+    "before" baseline: every one of those tokens was uncached input. The
+    "after" figure is what remains once the model's cached tokens are
+    subtracted. instruction_tokens shows how much of each call is the static,
+    cacheable prefix.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, kind: str, usage: Dict[str, int | None]):
+        with self._lock:
+            totals = self._totals.setdefault(kind, {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "instruction_tokens": 0,
+            })
+            totals["calls"] += 1
+            totals["prompt_tokens"] += usage["prompt_tokens"]
+            totals["cached_tokens"] += usage["cached_tokens"]
+            totals["instruction_tokens"] += usage.get("instruction_tokens") or 0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per kind, averaged per call: input tokens before (all sent uncached),
+        the static prefix's share of them, tokens the model served from its
+        cache, and the uncached input tokens after caching.
+        """
+        with self._lock:
+            return {
+                kind: {
+                    "calls": t["calls"],
+                    "avg_prompt_tokens": t["prompt_tokens"] / t["calls"],
+                    "avg_instruction_tokens": t["instruction_tokens"] / t["calls"],
+                    "avg_cached_tokens": t["cached_tokens"] / t["calls"],
+                    "avg_uncached_tokens": (t["prompt_tokens"] - t["cached_tokens"]) / t["calls"],
+                }
+                for kind, t in self._totals.items()
+            }
+
+
 # =====================================================================
 # GEMINI GENERATION CORE
 # =====================================================================
 
-def gemini_generate(prompt: str) -> Tuple[str | None, str | None]:
+@st.cache_resource
+def get_llm_queue() -> LLMWorkQueue:
+    """Process-wide LLM work queue shared by every Streamlit session."""
+    return LLMWorkQueue()
+
+
+@st.cache_resource
+def get_token_usage() -> TokenUsageStats:
+    """Process-wide input-token measurements for every Gemini call."""
+    return TokenUsageStats()
+
+
+def _gemini_call(prompt: str, system_instruction: str | None) -> Tuple[str, str, Dict[str, int]] | None:
     """
-    Generates content using the configured Gemini model, rotating through the 
-    list of 5 API keys until a successful response is received.
-    Returns (text, model_used_name).
+    Runs on a queue worker thread, so it must not call any Streamlit APIs.
+    Rotates through the API keys until one returns text.
+    Returns (text, model_used_name, usage), or None if every key failed.
     """
-    
-    # Check if all keys are missing or set to placeholders
-    if not any(key and key != f"YOUR_GEMINI_API_KEY_{i+1}" for i, key in enumerate(GEMINI_KEYS)):
-        st.error("❌ All Gemini API Keys are missing or set to placeholders. Please update core/llm_client.py with your 5 keys.")
-        return None, None
-    
-    # Iterate through keys for rotation
     for idx, key in enumerate(GEMINI_KEYS):
         if not key or key == f"YOUR_GEMINI_API_KEY_{idx+1}":
             # Skip empty or placeholder keys
             continue
-            
-        try:
-            # Configure and call the model with the current key
-            genai.configure(api_key=key)
-            model = genai.GenerativeModel("gemini-2.5-flash")
 
-            response = model.generate_content(prompt)
-            text = getattr(response, "text", "").strip()
+        try:
+            # Call the model with this key's own client
+            client = _get_client(key)
+            response = client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=_build_config(system_instruction),
+            )
+            text = (response.text or "").strip()
 
             if text:
-                return text, f"Gemini (Key {idx+1})"
+                metadata = getattr(response, "usage_metadata", None)
+                usage = {
+                    "prompt_tokens": getattr(metadata, "prompt_token_count", 0) or 0,
+                    "cached_tokens": getattr(metadata, "cached_content_token_count", 0) or 0,
+                    "instruction_tokens": _count_instruction_tokens(client, system_instruction),
+                }
+                return text, f"Gemini (Key {idx+1})", usage
 
         except Exception:
             # If the current key fails, suppress the error and try the next one
             continue
 
-    # If the loop finishes without returning, all valid keys failed
+    return None
+
+
+def gemini_generate(
+    prompt: str,
+    system_instruction: str | None = None,
+    priority: int = PRIORITY_FOREGROUND,
+    kind: str = "other",
+) -> Tuple[str | None, str | None]:
+    """
+    Generates content using the configured Gemini model, rotating through the 
+    list of 5 API keys until a successful response is received.
+
+    The call is routed through the shared work queue; while waiting, the
+    session's queue position is shown in place of a bare spinner. When the
+    queue is overloaded the request is shed and a cached response is used
+    if one exists. Input-token usage is recorded under `kind`.
+    Returns (text, model_used_name).
+    """
+    
+    # Check if all keys are missing or set to placeholders
+    if not any(key and key != f"YOUR_GEMINI_API_KEY_{i+1}" for i, key in enumerate(GEMINI_KEYS)):
+        st.error("❌ All Gemini API Keys are missing or set to placeholders. Please update core/llm_client.py with your 5 keys.")
+        return None, None
+
+    profiler.count("llm_calls")
+    queue = get_llm_queue()
+    job = queue.submit(
+        get_session_id(),
+        _gemini_call,
+        prompt,
+        system_instruction,
+        priority=priority,
+        cache_key=(system_instruction, prompt),
+    )
+
+    status = st.empty()
+    last_position = -1
+    while not job.done.wait(0.25):
+        position = None if job.started_at is not None else queue.position(job)
+        if position != last_position:
+            if position is not None:
+                status.caption(f"⏳ Waiting for AI capacity · position {position + 1} in queue")
+            else:
+                status.caption("🤖 Generating…")
+            last_position = position
+    status.empty()
+
+    if job.shed:
+        if job.result:
+            text, _, _ = job.result
+            return text, "Cached (service busy)"
+        st.warning("⚠️ The AI service is busy right now. Please try again in a moment.")
+        return None, None
+
+    if job.error is not None:
+        # A bug in the call itself, not a key failure: log it with its traceback
+        logger.error("Gemini request failed on a queue worker", exc_info=job.error)
+        st.error(f"⚠️ The AI request failed unexpectedly: {job.error}")
+        return None, None
+
+    if job.result:
+        text, model_used, usage = job.result
+        get_token_usage().record(kind, usage)
+        return text, model_used
+
+    # All valid keys failed
     st.error("⚠️ All provided Gemini API keys failed to generate content.")
     return None, None
 
@@ -67,6 +265,7 @@ def gemini_generate(prompt: str) -> Tuple[str | None, str | None]:
 # =====================================================================
 
 def build_prompt(term: str, category: str, depth: int, explain_in_hindi: bool) -> str:
+    # BASE_SYSTEM_INSTRUCTIONS is sent separately as the system_instruction
     base_prompt = PROMPT_TEMPLATE_ENGLISH.format(
         term=term,
         category=category,
@@ -74,15 +273,9 @@ def build_prompt(term: str, category: str, depth: int, explain_in_hindi: bool) -
     )
 
     if explain_in_hindi:
-        return (
-            BASE_SYSTEM_INSTRUCTIONS
-            + "\n\n"
-            + base_prompt
-            + "\n\n"
-            + PROMPT_TEMPLATE_HINDI
-        )
+        return base_prompt + "\n\n" + PROMPT_TEMPLATE_HINDI
 
-    return BASE_SYSTEM_INSTRUCTIONS + "\n\n" + base_prompt
+    return base_prompt
 
 
 # =====================================================================
@@ -97,11 +290,18 @@ def explain_term_with_llm(
 ) -> Dict[str, str]:
     """
     Main LLM interface for explaining Indian Preamble terms (Gemini only).
+    Answers already in the response cache (e.g. from explain_terms_batch)
+    are returned without a new LLM call.
     """
 
     prompt = build_prompt(term, category, depth, explain_in_hindi)
 
-    result, key_used = gemini_generate(prompt)
+    cached = get_llm_queue().cache_get((BASE_SYSTEM_INSTRUCTIONS, prompt))
+    if cached:
+        text, model_used, _ = cached
+        return {"text": text, "model_used": model_used}
+
+    result, key_used = gemini_generate(prompt, system_instruction=BASE_SYSTEM_INSTRUCTIONS, kind="term")
 
     if result:
         return {
@@ -116,13 +316,72 @@ def explain_term_with_llm(
     }
 
 
+# =====================================================================
+# BATCHED EXPLAINER — SEVERAL INDIAN PREAMBLE TERMS IN ONE CALL
+# =====================================================================
+
+def explain_terms_batch(
+    terms: List[Dict[str, str]],
+    explain_in_hindi: bool = False,
+    depth: int = 2,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Explains several Indian Preamble terms (e.g. a whole category) with a
+    single LLM call. The answer is split per term and each part is stored in
+    the response cache under the same key explain_term_with_llm uses, so
+    later single-term lookups are served without another call.
+
+    Returns {term_label: {"text": ..., "model_used": ...}}.
+    """
+    queue = get_llm_queue()
+    results: Dict[str, Dict[str, str]] = {}
+    missing = []
+
+    for term in terms:
+        cache_key = (BASE_SYSTEM_INSTRUCTIONS, build_prompt(term["label"], term["category"], depth, explain_in_hindi))
+        cached = queue.cache_get(cache_key)
+        if cached:
+            text, model_used, _ = cached
+            results[term["label"]] = {"text": text, "model_used": model_used}
+        else:
+            missing.append((term, cache_key))
+
+    if missing:
+        prompt = build_batch_prompt([term for term, _ in missing], depth, explain_in_hindi)
+        result, key_used = gemini_generate(
+            prompt,
+            system_instruction=BASE_SYSTEM_INSTRUCTIONS,
+            priority=PRIORITY_BATCH,
+            kind="batch",
+        )
+        sections = split_batch_response(result, [term["label"] for term, _ in missing]) if result else {}
+        model_used = f"{key_used or 'Gemini'} · batch of {len(missing)}"
+
+        for term, cache_key in missing:
+            text = sections.get(term["label"])
+            if text:
+                queue.cache_put(cache_key, (text, model_used, {}))
+                results[term["label"]] = {"text": text, "model_used": model_used}
+            else:
+                # FINAL FALLBACK (call failed or the term's section was missing)
+                results[term["label"]] = {
+                    "text": "⚠️ LLM generation failed for this term. Try explaining it individually.",
+                    "model_used": "None",
+                }
+
+    return {term["label"]: results[term["label"]] for term in terms}
+
+
 # =====================================================================
 # GLOBAL PREAMBLE EXPLORER FUNCTIONS
 # =====================================================================
 
-def build_global_prompt(country_name: str, preamble_text: str, include_comparison: bool) -> str:
-    comparison_section = PROMPT_TEMPLATE_COMPARISON_SECTION if include_comparison else ""
-    
+def build_global_prompt(country_name: str, preamble_text: str, comparison_facts: str | None = None) -> str:
+    comparison_section = (
+        PROMPT_TEMPLATE_COMPARISON_SECTION.format(comparison_facts=comparison_facts)
+        if comparison_facts else ""
+    )
+
     return PROMPT_TEMPLATE_GLOBAL_EXPLAINER.format(
         country_name=country_name,
         preamble_text=preamble_text,
@@ -130,13 +389,29 @@ def build_global_prompt(country_name: str, preamble_text: str, include_compariso
     )
 
 
-def explain_preamble_global(country_name: str, preamble_text: str, include_comparison: bool) -> Dict[str, str]:
+def explain_preamble_global(
+    country_name: str,
+    preamble_text: str,
+    include_comparison: bool,
+    comparison: Dict | None = None,
+    fast_mode: bool = False,
+) -> Dict[str, str]:
     """
     Generates an explanation and analysis for a country's preamble.
+
+    The India comparison is computed locally (see core/similarity.py); the LLM
+    only narrates those facts, and in fast mode it is not asked about the
+    comparison at all.
     """
-    prompt = build_global_prompt(country_name, preamble_text, include_comparison)
+    comparison_facts = None
+    if include_comparison and not fast_mode:
+        if comparison is None:
+            comparison = compare_with_india({country_name: preamble_text})[country_name]
+        comparison_facts = format_comparison_facts(country_name, comparison)
+
+    prompt = build_global_prompt(country_name, preamble_text, comparison_facts)
     
-    result, key_used = gemini_generate(prompt)
+    result, key_used = gemini_generate(prompt, system_instruction=GLOBAL_SYSTEM_INSTRUCTIONS, kind="global")
 
     if result:
         return {
@@ -157,12 +432,13 @@ def fetch_country_preamble(country: str) -> Tuple[str | None, str, str]:
     Returns (preamble_text, message, source).
     """
     
-    system_prompt = "You are a political science expert. Your task is to write a highly authentic and formal constitutional preamble for the given country, based on typical democratic principles. Output ONLY the preamble text."
     llm_query = f"Write the constitutional preamble of {country} in an authentic formal style, focusing on its core values."
     
-    prompt = f"{system_prompt}\n\n{llm_query}"
-    
-    result, key_used = gemini_generate(prompt)
+    result, key_used = gemini_generate(
+        llm_query,
+        system_instruction=PREAMBLE_WRITER_SYSTEM_INSTRUCTIONS,
+        kind="fetch",
+    )
     
     source = key_used or "Gemini (AI-Generated)"
 
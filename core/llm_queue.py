@@ -0,0 +1,208 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Callable, Dict, Hashable
+
+# =====================================================================
+# PRIORITIES & LIMITS
+#
+# One queue is shared by every Streamlit session in the process, so a burst
+# of users never produces more than MAX_WORKERS concurrent upstream calls.
+# =====================================================================
+
+PRIORITY_FOREGROUND = 0   # The user is waiting for this answer right now
+PRIORITY_BATCH = 1        # Bulk work (e.g. explaining many terms at once)
+
+MAX_WORKERS = 4
+MAX_QUEUE_DEPTH = 32
+MAX_PENDING_PER_SESSION = 3
+RESPONSE_CACHE_SIZE = 256
+
+
+class LLMJob:
+    """A unit of LLM work waiting in (or finished by) the queue."""
+
+    def __init__(self, session_id: str, fn: Callable, args: tuple, priority: int, cache_key: Hashable | None):
+        self.session_id = session_id
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.cache_key = cache_key
+        self.sort_key: tuple | None = None
+        self.enqueued_at = time.monotonic()
+        self.started_at: float | None = None
+        self.result: Any = None
+        self.error: Exception | None = None
+        # True when the job was rejected by admission control; result then
+        # holds a cached response (or None if nothing was cached).
+        self.shed = False
+        self.done = threading.Event()
+
+
+class LLMWorkQueue:
+    """
+    Bounded worker pool with a priority queue and per-session fair ordering.
+
+    Jobs are ordered by (priority, virtual finish tag, arrival). Each session's
+    tag advances by one per job, starting no earlier than the tag of the last
+    dispatched job, so a session that submits many jobs cannot starve others
+    with the same priority (start-time fair queuing).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        max_depth: int = MAX_QUEUE_DEPTH,
+        max_pending_per_session: int = MAX_PENDING_PER_SESSION,
+        cache_size: int = RESPONSE_CACHE_SIZE,
+    ):
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.max_pending_per_session = max_pending_per_session
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._virtual_time = 0
+        self._session_tags: Dict[str, int] = defaultdict(int)
+        self._session_pending: Dict[str, int] = defaultdict(int)
+        self._cache: OrderedDict = OrderedDict()
+        self._workers: list = []
+
+        self._in_flight = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "shed": 0, "cache_hits_on_shed": 0}
+        self._wait_times = deque(maxlen=200)
+
+    # -----------------------------------------------------------------
+    # Submission
+    # -----------------------------------------------------------------
+
+    def submit(
+        self,
+        session_id: str,
+        fn: Callable,
+        *args,
+        priority: int = PRIORITY_FOREGROUND,
+        cache_key: Hashable | None = None,
+    ) -> LLMJob:
+        """
+        Enqueues fn(*args) for a worker thread. If the queue is too deep or the
+        session is over its quota, the job is shed immediately and resolved
+        with the cached response for cache_key (if any).
+        """
+        job = LLMJob(session_id, fn, args, priority, cache_key)
+
+        with self._lock:
+            self._counters["submitted"] += 1
+            self._ensure_workers()
+
+            # Background work is shed earlier so foreground requests keep headroom
+            depth_limit = self.max_depth if priority == PRIORITY_FOREGROUND else self.max_depth // 2
+            if len(self._heap) >= depth_limit or self._session_pending[session_id] >= self.max_pending_per_session:
+                self._shed(job)
+                return job
+
+            tag = max(self._virtual_time, self._session_tags[session_id]) + 1
+            self._session_tags[session_id] = tag
+            self._session_pending[session_id] += 1
+            job.sort_key = (priority, tag, next(self._seq))
+            heapq.heappush(self._heap, (job.sort_key, job))
+            self._not_empty.notify()
+
+        return job
+
+    def _shed(self, job: LLMJob):
+        # Caller holds self._lock
+        self._counters["shed"] += 1
+        job.shed = True
+        if job.cache_key is not None and job.cache_key in self._cache:
+            self._counters["cache_hits_on_shed"] += 1
+            job.result = self._cache[job.cache_key]
+        job.done.set()
+
+    # -----------------------------------------------------------------
+    # Workers
+    # -----------------------------------------------------------------
+
+    def _ensure_workers(self):
+        # Caller holds self._lock; workers are started lazily on first use
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._worker_loop, name=f"llm-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _worker_loop(self):
+        while True:
+            with self._not_empty:
+                while not self._heap:
+                    self._not_empty.wait()
+                _, job = heapq.heappop(self._heap)
+                self._virtual_time = job.sort_key[1]
+                self._session_pending[job.session_id] -= 1
+                if not self._session_pending[job.session_id]:
+                    del self._session_pending[job.session_id]
+                self._in_flight += 1
+                job.started_at = time.monotonic()
+                self._wait_times.append(job.started_at - job.enqueued_at)
+
+            try:
+                job.result = job.fn(*job.args)
+            except Exception as exc:  # Surfaced by the caller on the session's script thread
+                job.error = exc
+
+            with self._lock:
+                self._in_flight -= 1
+                # A None result means the job ran but produced nothing (e.g. every key failed)
+                if job.error is not None or job.result is None:
+                    self._counters["failed"] += 1
+                else:
+                    self._counters["completed"] += 1
+                    if job.cache_key is not None:
+                        self._cache_put(job.cache_key, job.result)
+            job.done.set()
+
+    # -----------------------------------------------------------------
+    # Response cache
+    # -----------------------------------------------------------------
+
+    def _cache_put(self, key: Hashable, value: Any):
+        # Caller holds self._lock
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def cache_get(self, key: Hashable) -> Any:
+        with self._lock:
+            return self._cache.get(key)
+
+    def cache_put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._cache_put(key, value)
+
+    # -----------------------------------------------------------------
+    # Introspection
+    # -----------------------------------------------------------------
+
+    def position(self, job: LLMJob) -> int:
+        """Returns how many queued jobs are ahead of job (0 once it is running or done)."""
+        with self._lock:
+            if job.started_at is not None or job.done.is_set():
+                return 0
+            return sum(1 for key, _ in self._heap if key < job.sort_key)
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            waits = sorted(self._wait_times)
+            return {
+                "queue_depth": len(self._heap),
+                "in_flight": self._in_flight,
+                "workers": self.max_workers,
+                **self._counters,
+                "avg_wait_s": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait_s": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            }
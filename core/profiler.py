@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+
+import streamlit as st
+
+from .session import get_session_id
+
+# =====================================================================
+# OPT-IN RERUN PROFILER
+#
+# Enable with ?profile=1 in the URL or PREAMBLE_PROFILE=1 in the environment.
+# Every script run records its section timings, LLM calls and st.rerun()
+# calls; finished runs are appended to PREAMBLE_PROFILE_PATH as JSONL.
+# =====================================================================
+
+PROFILE_ENV_VAR = "PREAMBLE_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+TRACE_PATH = os.environ.get("PREAMBLE_PROFILE_PATH", "profile_traces.jsonl")
+
+_STATE_KEY = "_profiler"
+_CHAIN_KEY = "_profiler_chain"
+# Streamlit stops or restarts a script run by raising these inside it
+_CONTROL_FLOW_EXCEPTIONS = ("RerunException", "StopException")
+_write_lock = threading.Lock()
+
+
+class RerunProfiler:
+    """Collects timings and counters for a single execution of main()."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.run_id = uuid.uuid4().hex[:8]
+        self.started_at = time.perf_counter()
+        self.timestamp = datetime.now().isoformat(timespec="seconds")
+        self.sections = []
+        self.counters = {"llm_calls": 0, "reruns": 0}
+        self._stack = []
+
+    @contextmanager
+    def section(self, name: str):
+        self._stack.append((name, time.perf_counter()))
+        depth = len(self._stack)
+        try:
+            yield
+        finally:
+            # The section may already have been closed by a flush (st.rerun() inside it)
+            if len(self._stack) >= depth:
+                self._close_top()
+
+    def _close_top(self):
+        name, start = self._stack[-1]
+        self.sections.append({
+            "section": " › ".join(n for n, _ in self._stack),
+            "depth": len(self._stack) - 1,
+            "ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+        self._stack.pop()
+
+    def close_open_sections(self):
+        """Records every still-open section, innermost first, up to now."""
+        while self._stack:
+            self._close_top()
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def to_trace(self, ended_by: str, error: str | None = None) -> dict:
+        self.close_open_sections()
+        trace = {
+            "session_id": self.session_id,
+            "run_id": self.run_id,
+            "timestamp": self.timestamp,
+            "ended_by": ended_by,
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 2),
+            "counters": dict(self.counters),
+            "sections": list(self.sections),
+        }
+        if error is not None:
+            trace["error"] = error
+        return trace
+
+
+# =====================================================================
+# SESSION-LEVEL HELPERS
+# =====================================================================
+
+def profiling_enabled() -> bool:
+    if os.environ.get(PROFILE_ENV_VAR, "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get(PROFILE_QUERY_PARAM, "").lower() in ("1", "true", "yes")
+
+
+def start_run():
+    """Call at the top of main(); creates this run's profiler when enabled."""
+    if not profiling_enabled():
+        st.session_state.pop(_STATE_KEY, None)
+        st.session_state.pop(_CHAIN_KEY, None)
+        return
+
+    # A run that never reached finish_run()/abort_run() is flushed, not dropped
+    if current() is not None:
+        _finish("interrupted")
+
+    chain = st.session_state.get(_CHAIN_KEY, [])
+    # Only runs ended by our own st.rerun() continue the same interaction
+    if chain and chain[-1]["ended_by"] != "rerun":
+        chain = []
+    st.session_state[_CHAIN_KEY] = chain
+
+    st.session_state[_STATE_KEY] = RerunProfiler(get_session_id())
+
+
+def current() -> RerunProfiler | None:
+    return st.session_state.get(_STATE_KEY)
+
+
+def section(name: str):
+    """Times a block of the script; a no-op when profiling is disabled."""
+    profiler = current()
+    return profiler.section(name) if profiler else nullcontext()
+
+
+def profiled(fn):
+    """Decorator timing each call of fn as its own section."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with section(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def count(counter: str, amount: int = 1):
+    profiler = current()
+    if profiler:
+        profiler.count(counter, amount)
+
+
+def _finish(ended_by: str, error: str | None = None) -> dict | None:
+    profiler = st.session_state.pop(_STATE_KEY, None)
+    if profiler is None:
+        return None
+
+    trace = profiler.to_trace(ended_by, error)
+    st.session_state.setdefault(_CHAIN_KEY, []).append(trace)
+
+    try:
+        with _write_lock, open(TRACE_PATH, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(trace) + "\n")
+    except OSError:
+        # Tracing must never break the app (e.g. read-only file system)
+        pass
+
+    return trace
+
+
+def rerun():
+    """Replacement for st.rerun() that records the rerun and flushes the trace first."""
+    count("reruns")
+    _finish("rerun")
+    st.rerun()
+
+
+def finish_run():
+    """Call at the end of main(); records the trace and renders the overlay."""
+    if _finish("complete") is None:
+        return
+    render_overlay(st.session_state.get(_CHAIN_KEY, []))
+
+
+def abort_run(exc: BaseException):
+    """
+    Call from main()'s exception handler before re-raising: records runs cut
+    short by an error or by Streamlit interrupting them (e.g. a click mid-run).
+    Runs already flushed by rerun() are left alone.
+    """
+    if type(exc).__name__ in _CONTROL_FLOW_EXCEPTIONS:
+        _finish("interrupted")
+    else:
+        _finish("error", error=repr(exc))
+
+
+# =====================================================================
+# OVERLAY
+# =====================================================================
+
+def render_overlay(chain: list):
+    total_ms = sum(trace["total_ms"] for trace in chain)
+    llm_calls = sum(trace["counters"].get("llm_calls", 0) for trace in chain)
+    reruns = sum(trace["counters"].get("reruns", 0) for trace in chain)
+
+    with st.expander(f"🔬 Profiler · {total_ms:.0f} ms · {len(chain)} run(s) · {llm_calls} LLM call(s)", expanded=True):
+        st.caption(
+            f"Last interaction: {len(chain)} script run(s), {reruns} st.rerun() call(s), "
+            f"{llm_calls} LLM call(s). Traces are appended to {TRACE_PATH}."
+        )
+        for i, trace in enumerate(chain, start=1):
+            st.markdown(f"**Run {i}** · {trace['total_ms']:.0f} ms · ended by `{trace['ended_by']}`")
+            rows = sorted(trace["sections"], key=lambda row: row["ms"], reverse=True)
+            st.table([{"section": row["section"], "ms": row["ms"]} for row in rows])
@@ -9,16 +9,10 @@ Your explanations must:
 - Avoid giving legal advice; only provide general educational information.
 """
 
-PROMPT_TEMPLATE_ENGLISH = """
-Explain the term "{term}" as it appears in the Preamble of the Constitution of India.
-
-Context:
-- Term category: {category}
-- Audience: university students + general citizens
-- Depth level: {depth} (1 = very short, 3 = detailed)
-
-Structure your answer in this format:
-
+# Per-term answer structure, shared by the single-term and batched prompts.
+# Batched answers are cached under the single-term key, so both must ask
+# for exactly the same format.
+ANSWER_STRUCTURE_ENGLISH = """
 1. Simple meaning (2–3 lines)
 2. Constitutional significance (How does it shape India's democracy?)
 3. Real-life example from everyday Indian life (non-technical)
@@ -27,9 +21,7 @@ Structure your answer in this format:
 Write clearly and concisely. Do not use bullet points inside headings; just simple paragraphs.
 """
 
-PROMPT_TEMPLATE_HINDI = """
-अब आप वही बात हिंदी में समझाएँ।
-
+ANSWER_STRUCTURE_HINDI = """
 संरचना (Structure):
 
 1. सरल अर्थ (2–3 पंक्तियाँ)
@@ -40,29 +32,81 @@ PROMPT_TEMPLATE_HINDI = """
 भाषा सरल, सम्मानजनक और आसानी से समझ आने वाली रखें।
 """
 
-# --- NEW PROMPT FOR WORLD PREAMBLE EXPLORER ---
+PROMPT_TEMPLATE_ENGLISH = """
+Explain the term "{term}" as it appears in the Preamble of the Constitution of India.
 
-PROMPT_TEMPLATE_GLOBAL_EXPLAINER = """
-Analyze the following Constitutional Preamble for the country: "{country_name}".
+Context:
+- Term category: {category}
+- Audience: university students + general citizens
+- Depth level: {depth} (1 = very short, 3 = detailed)
 
-Preamble Text:
----
-{preamble_text}
----
+Structure your answer in this format:
+""" + ANSWER_STRUCTURE_ENGLISH
+
+PROMPT_TEMPLATE_HINDI = """
+अब आप वही बात हिंदी में समझाएँ।
+""" + ANSWER_STRUCTURE_HINDI
+
+# --- BATCHED PROMPT (several Indian Preamble terms in one call) ---
+
+PROMPT_TEMPLATE_BATCH_ENGLISH = """
+Explain each of the following terms as they appear in the Preamble of the Constitution of India:
+
+{term_list}
+
+Context:
+- Audience: university students + general citizens
+- Depth level: {depth} (1 = very short, 3 = detailed)
 
-Your task is to provide a comprehensive analysis based on the structure below.
-The analysis should be insightful and educational, suitable for general citizens.
+For EACH term, start a new section with a line containing exactly "### TERM: <term>"
+(using the term exactly as listed above), then structure that term's answer in this format:
+""" + ANSWER_STRUCTURE_ENGLISH
+
+PROMPT_TEMPLATE_BATCH_HINDI = """
+अब हर शब्द के लिए वही बात हिंदी में भी समझाएँ, उसी शब्द के "### TERM: <term>" खंड के अंदर।
+"### TERM: <term>" पंक्तियाँ अंग्रेज़ी में ही और बिना बदलाव के रखें।
+""" + ANSWER_STRUCTURE_HINDI
+
+# --- NEW PROMPT FOR WORLD PREAMBLE EXPLORER ---
+
+# Static scaffolding shared by every global analysis. It is sent as the model's
+# system_instruction, which keeps it an identical prefix on every call so the
+# model's implicit caching can reuse it. Only the country, its preamble and
+# the optional comparison facts vary per request.
+GLOBAL_SYSTEM_INSTRUCTIONS = """
+You are an expert in comparative constitutional law. You analyze Constitutional
+Preambles of countries around the world for general citizens.
+
+Your analysis should be insightful and educational, suitable for general citizens.
 
 Structure your answer in this format:
 
 1. Main Values & Themes (Identify 3-5 core principles, e.g., unity, sovereignty, faith).
 2. Constitutional Significance (What is the Preamble's role in this country's system?)
 3. Summary of Key Goals (Concisely explain what the people are establishing or securing).
-{comparison_section}
+
+Only if the request contains "Precomputed comparison facts", add:
+
+4. Comparison to the Indian Preamble (In 2-3 sentences, narrate ONLY those precomputed facts about the Preamble to the Constitution of India: 'SOVEREIGN SOCIALIST SECULAR DEMOCRATIC REPUBLIC... JUSTICE, LIBERTY, EQUALITY, FRATERNITY...'. Do not add other comparisons.)
 
 Write clearly and concisely. Do not use bullet points inside headings; just simple paragraphs.
 """
 
+PROMPT_TEMPLATE_GLOBAL_EXPLAINER = """
+Analyze the following Constitutional Preamble for the country: "{country_name}".
+
+Preamble Text:
+---
+{preamble_text}
+---
+{comparison_section}
+"""
+
 PROMPT_TEMPLATE_COMPARISON_SECTION = """
-4. Comparison to the Indian Preamble (Briefly contrast or compare 1-2 key differences or similarities with the Preamble to the Constitution of India: 'SOVEREIGN SOCIALIST SECULAR DEMOCRATIC REPUBLIC... JUSTICE, LIBERTY, EQUALITY, FRATERNITY...').
-"""
\ No newline at end of file
+Precomputed comparison facts:
+{comparison_facts}
+"""
+
+PREAMBLE_WRITER_SYSTEM_INSTRUCTIONS = """
+You are a political science expert. Your task is to write a highly authentic and formal constitutional preamble for the given country, based on typical democratic principles. Output ONLY the preamble text.
+"""
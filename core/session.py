@@ -0,0 +1,11 @@
+import uuid
+import streamlit as st
+
+SESSION_ID_KEY = "session_id"
+
+
+def get_session_id() -> str:
+    """Stable id of the current Streamlit session, shared by the LLM queue and the profiler."""
+    if SESSION_ID_KEY not in st.session_state:
+        st.session_state[SESSION_ID_KEY] = uuid.uuid4().hex
+    return st.session_state[SESSION_ID_KEY]
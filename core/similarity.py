@@ -0,0 +1,175 @@
+import re
+import numpy as np
+from typing import Dict, List, Tuple
+
+from .preamble_data import PREAMBLE_TEXT, PREAMBLE_TERMS
+
+# =====================================================================
+# VALUE KEYWORDS (mapped to PREAMBLE_TERMS)
+#
+# Each Indian Preamble term is matched by a small set of word stems so that
+# e.g. "sovereignty", "freedom" or "brotherhood" count towards the same value.
+# Stems are kept specific: generic words such as "social", "religion" or
+# "unity" appear just as often in preambles that do not share the value.
+# =====================================================================
+
+VALUE_KEYWORDS = {
+    "Sovereign": ["sovereign", "independen", "self-determination"],
+    "Socialist": ["socialis"],
+    "Secular": ["secular"],
+    "Democratic": ["democra", "elected", "representative"],
+    "Republic": ["republic"],
+    "Justice": ["justice", "rule of law"],
+    "Liberty": ["libert", "freedom"],
+    "Equality": ["equal"],
+    "Fraternity": ["fraternity", "brotherhood", "solidarity"],
+}
+
+# Phrases that rule a value out even if one of its keywords matched
+# (ignored when preceded by "no"/"not", e.g. "no state religion")
+VALUE_NEGATIONS = {
+    "Secular": ["state religion", "religion of the state", "official religion"],
+}
+
+TERM_LABELS = [term["label"] for term in PREAMBLE_TERMS]
+TERM_CATEGORIES = {term["label"]: term["category"] for term in PREAMBLE_TERMS}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "for", "from",
+    "have", "in", "into", "is", "it", "its", "of", "on", "or", "our",
+    "that", "the", "their", "them", "this", "to", "we", "which", "with",
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+
+# =====================================================================
+# TOKENIZATION & TF-IDF
+# =====================================================================
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases the text and returns its word tokens without stopwords."""
+    return [tok for tok in _TOKEN_RE.findall(text.lower()) if tok not in STOPWORDS]
+
+
+def build_tfidf_matrix(texts: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Builds an L2-normalised TF-IDF matrix (one row per text) over the shared
+    vocabulary of all texts. Returns (matrix, vocabulary).
+    """
+    tokenized = [tokenize(text) for text in texts]
+    vocab = sorted({tok for tokens in tokenized for tok in tokens})
+    index = {tok: i for i, tok in enumerate(vocab)}
+
+    counts = np.zeros((len(texts), len(vocab)), dtype=np.float64)
+    for row, tokens in enumerate(tokenized):
+        if tokens:
+            cols = np.fromiter((index[tok] for tok in tokens), dtype=np.intp, count=len(tokens))
+            np.add.at(counts[row], cols, 1.0)
+
+    # Smoothed IDF (same formulation as scikit-learn's default)
+    doc_freq = np.count_nonzero(counts, axis=0)
+    idf = np.log((1.0 + len(texts)) / (1.0 + doc_freq)) + 1.0
+
+    tfidf = counts * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return tfidf / norms, vocab
+
+
+def _stem_pattern(stems: List[str]) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(re.escape(k) for k in stems) + r")")
+
+
+def _negation_pattern(phrases: List[str]) -> re.Pattern:
+    # Texts are matched after tokenization, so words are single-space separated
+    return re.compile(r"\b(?<!no )(?<!not )(?:" + "|".join(re.escape(p) for p in phrases) + r")")
+
+
+def keyword_presence_matrix(texts: List[str]) -> np.ndarray:
+    """
+    Returns a boolean matrix of shape (len(texts), len(TERM_LABELS)) marking
+    which Preamble values are mentioned in each text.
+    """
+    lowered = [" ".join(_TOKEN_RE.findall(text.lower())) for text in texts]
+    presence = np.zeros((len(texts), len(TERM_LABELS)), dtype=bool)
+
+    for col, label in enumerate(TERM_LABELS):
+        pattern = _stem_pattern(VALUE_KEYWORDS[label])
+        negation = _negation_pattern(VALUE_NEGATIONS[label]) if label in VALUE_NEGATIONS else None
+        presence[:, col] = [
+            bool(pattern.search(text)) and not (negation and negation.search(text))
+            for text in lowered
+        ]
+
+    return presence
+
+
+# =====================================================================
+# INDIA COMPARISON
+# =====================================================================
+
+def compare_with_india(preambles: Dict[str, str], top_n: int = 5) -> Dict[str, Dict]:
+    """
+    Compares any number of country preambles with the Indian Preamble in one
+    batch. India is always row 0 of the TF-IDF matrix, so the similarity of
+    every country is a single matrix-vector product.
+
+    Returns {country: comparison}, where comparison holds the cosine
+    similarity, shared/missing values (grouped by PREAMBLE_TERMS category)
+    and the top shared vocabulary.
+    """
+    countries = list(preambles)
+    if not countries:
+        return {}
+
+    texts = [PREAMBLE_TEXT] + [preambles[c] for c in countries]
+    tfidf, vocab = build_tfidf_matrix(texts)
+    presence = keyword_presence_matrix(texts)
+
+    india_vec = tfidf[0]
+    similarities = tfidf[1:] @ india_vec
+
+    # Element-wise product highlights the words contributing most to the score
+    contributions = tfidf[1:] * india_vec
+
+    india_values = presence[0]
+    shared_mask = presence[1:] & india_values
+    missing_mask = ~presence[1:] & india_values
+
+    results = {}
+    for row, country in enumerate(countries):
+        top_idx = np.argsort(contributions[row])[::-1][:top_n]
+        results[country] = {
+            "similarity": float(similarities[row]),
+            "shared_values": _group_by_category(shared_mask[row]),
+            "missing_values": _group_by_category(missing_mask[row]),
+            "value_overlap": float(shared_mask[row].sum() / max(india_values.sum(), 1)),
+            "shared_words": [vocab[i] for i in top_idx if contributions[row, i] > 0],
+        }
+
+    return results
+
+
+def _group_by_category(mask: np.ndarray) -> Dict[str, List[str]]:
+    grouped: Dict[str, List[str]] = {}
+    for label, hit in zip(TERM_LABELS, mask):
+        if hit:
+            grouped.setdefault(TERM_CATEGORIES[label], []).append(label)
+    return grouped
+
+
+def _format_grouped(grouped: Dict[str, List[str]]) -> str:
+    if not grouped:
+        return "none"
+    return "; ".join(f"{category}: {', '.join(labels)}" for category, labels in grouped.items())
+
+
+def format_comparison_facts(country_name: str, comparison: Dict) -> str:
+    """Renders a comparison as plain-text facts for the LLM to narrate."""
+    return "\n".join([
+        f"- Text similarity between {country_name} and India (TF-IDF cosine): {comparison['similarity']:.2f}",
+        f"- Indian values also present in {country_name}: {_format_grouped(comparison['shared_values'])}",
+        f"- Indian values not mentioned by {country_name}: {_format_grouped(comparison['missing_values'])}",
+        f"- Most important shared words: {', '.join(comparison['shared_words']) or 'none'}",
+    ])
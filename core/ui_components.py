@@ -1,5 +1,7 @@
 import streamlit as st
 
+from .profiler import profiled, section
+
 
 # ====================================================================
 # SHARED CSS STYLES (Cleaned up and simplified)
@@ -84,9 +86,11 @@ CUSTOM_CSS = """
 """
 
 
+@profiled
 def render_header():
     # Inject custom CSS first
-    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    with section("css_injection"):
+        st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
     
     st.markdown(f"""
         <h1 style="text-align: center; color: #1b2a49; margin-bottom: 5px;">
@@ -103,6 +107,7 @@ def render_header():
 # INDIAN PREAMBLE COMPONENTS
 # ====================================================================
 
+@profiled
 def render_preamble_card(text):
     # Using an expander to keep the UI compact
     with st.expander("📜 Preamble of the Constitution of India (View Full Text)", expanded=False):
@@ -113,6 +118,7 @@ def render_preamble_card(text):
         """, unsafe_allow_html=True)
 
 
+@profiled
 def render_term_buttons(terms):
     st.markdown("### 🇮🇳 Explore Key Constitutional Values")
     
@@ -127,6 +133,26 @@ def render_term_buttons(terms):
     return selected
 
 
+@profiled
+def render_batch_buttons(terms):
+    st.markdown("##### 📚 Explain all values")
+
+    categories = list(dict.fromkeys(term["category"] for term in terms))
+    cols = st.columns(len(categories) + 1)
+    selected = None
+
+    for col, category in zip(cols, categories):
+        with col:
+            if st.button(f"All {category} values", key=f"batch_{category}", use_container_width=True):
+                selected = category
+    with cols[-1]:
+        if st.button(f"All {len(terms)} values", key="batch_all", use_container_width=True):
+            selected = "All"
+
+    return selected
+
+
+@profiled
 def render_explanation_card(term, category, explanation, explain_in_hindi):
     lang = "Hindi + English" if explain_in_hindi else "English"
 
@@ -147,6 +173,7 @@ def render_explanation_card(term, category, explanation, explain_in_hindi):
 # GLOBAL PREAMBLE COMPONENTS
 # ====================================================================
 
+@profiled
 def render_global_preamble_card(country: str, preamble: str, source: str):
     st.markdown(f"""
         <div class="custom-card global-card">
@@ -161,6 +188,7 @@ def render_global_preamble_card(country: str, preamble: str, source: str):
     """, unsafe_allow_html=True)
 
 
+@profiled
 def render_global_explanation_card(country: str, explanation: dict, include_comparison: bool):
     comparison_mode = "with India Comparison" if include_comparison else "Analysis Only"
     
@@ -177,10 +205,33 @@ def render_global_explanation_card(country: str, explanation: dict, include_comp
     """, unsafe_allow_html=True)
 
 
+@profiled
+def render_comparison_card(country: str, comparison: dict):
+    def fmt(grouped):
+        if not grouped:
+            return "—"
+        return " · ".join(f"<b>{category}</b>: {', '.join(labels)}" for category, labels in grouped.items())
+
+    shared_words = ", ".join(comparison["shared_words"]) or "—"
+
+    st.markdown(f"""
+        <div class="custom-card indian-card">
+            <h4>⚖️ {country} vs. India (Local Comparison)</h4>
+            <p style="margin-top:-8px; color:#6c757d; font-size: 0.9rem;">
+                Text similarity: <b>{comparison['similarity']:.0%}</b> · Value overlap: <b>{comparison['value_overlap']:.0%}</b>
+            </p>
+            <p style="margin: 4px 0;">✅ Shared values: {fmt(comparison['shared_values'])}</p>
+            <p style="margin: 4px 0;">➖ Not mentioned: {fmt(comparison['missing_values'])}</p>
+            <p style="margin: 4px 0; font-size: 0.9rem; color:#6c757d;">Key shared words: {shared_words}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+
 # ====================================================================
 # HISTORY PANEL (UPDATED)
 # ====================================================================
 
+@profiled
 def render_history_panel(history):
     st.markdown(f"""
         <div class="custom-card history-panel-card">
@@ -218,10 +269,38 @@ def render_history_panel(history):
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+# ====================================================================
+# AI SERVICE STATUS
+# ====================================================================
+
+@profiled
+def render_queue_status(metrics: dict, token_usage: dict | None = None):
+    with st.expander("⚙️ AI Service Status", expanded=False):
+        st.caption(
+            f"Queue depth: {metrics['queue_depth']} · In flight: {metrics['in_flight']}/{metrics['workers']}"
+        )
+        st.caption(
+            f"Avg wait: {metrics['avg_wait_s']:.1f}s · p95 wait: {metrics['p95_wait_s']:.1f}s"
+        )
+        st.caption(
+            f"Completed: {metrics['completed']} · Failed: {metrics['failed']} · "
+            f"Shed: {metrics['shed']} ({metrics['cache_hits_on_shed']} served from cache)"
+        )
+
+        for kind, usage in (token_usage or {}).items():
+            st.caption(
+                f"Input tokens ({kind}, {usage['calls']} calls): "
+                f"{usage['avg_prompt_tokens']:.0f}/call uncached before → "
+                f"{usage['avg_uncached_tokens']:.0f}/call uncached now "
+                f"(static prefix {usage['avg_instruction_tokens']:.0f}, cached by model {usage['avg_cached_tokens']:.0f})"
+            )
+
+
 # ====================================================================
 # FOOTER
 # ====================================================================
 
+@profiled
 def render_footer():
     st.divider()
     st.markdown("""
@@ -0,0 +1,78 @@
+from core.batching import build_batch_prompt, split_batch_response
+from core.prompts import (
+    ANSWER_STRUCTURE_ENGLISH,
+    ANSWER_STRUCTURE_HINDI,
+    PROMPT_TEMPLATE_ENGLISH,
+    PROMPT_TEMPLATE_HINDI,
+)
+
+LABELS = ["Justice", "Liberty", "Equality"]
+
+
+def test_split_on_headings():
+    text = (
+        "Here are the explanations.\n"
+        "### TERM: Justice\n1. Fairness for all.\n"
+        "### TERM: Liberty\n1. Freedom of thought.\n"
+        "### TERM: Equality\n1. Same status.\n"
+    )
+    assert split_batch_response(text, LABELS) == {
+        "Justice": "1. Fairness for all.",
+        "Liberty": "1. Freedom of thought.",
+        "Equality": "1. Same status.",
+    }
+
+
+def test_missing_heading_is_left_out():
+    text = "### TERM: Justice\nFairness.\n### TERM: Equality\nSame status.\n"
+    sections = split_batch_response(text, LABELS)
+    assert set(sections) == {"Justice", "Equality"}
+
+
+def test_duplicate_headings_are_appended_not_overwritten():
+    text = (
+        "### TERM: Justice\nEnglish justice.\n"
+        "### TERM: Liberty\nEnglish liberty.\n"
+        "### TERM: Justice\nहिंदी न्याय।\n"
+        "### TERM: Liberty\nहिंदी स्वतंत्रता।\n"
+    )
+    sections = split_batch_response(text, LABELS)
+    assert sections["Justice"] == "English justice.\n\nहिंदी न्याय।"
+    assert sections["Liberty"] == "English liberty.\n\nहिंदी स्वतंत्रता।"
+
+
+def test_bold_and_case_variants():
+    text = (
+        "## **TERM: justice**\nFairness.\n"
+        "**TERM: Liberty**\nFreedom.\n"
+        "### Term: **Equality**\nSame status.\n"
+    )
+    assert split_batch_response(text, LABELS) == {
+        "Justice": "Fairness.",
+        "Liberty": "Freedom.",
+        "Equality": "Same status.",
+    }
+
+
+def test_unknown_heading_ends_previous_section():
+    text = "### TERM: Justice\nFairness.\n### TERM: Dharma\nNot requested.\n"
+    assert split_batch_response(text, LABELS) == {"Justice": "Fairness."}
+
+
+def test_build_batch_prompt_lists_terms():
+    terms = [{"label": "Justice", "category": "Core Value"}, {"label": "Secular", "category": "Foundational"}]
+    prompt = build_batch_prompt(terms, depth=1, explain_in_hindi=False)
+    assert "- Justice (category: Core Value)" in prompt
+    assert "- Secular (category: Foundational)" in prompt
+    assert "हिंदी" not in build_batch_prompt(terms, depth=1, explain_in_hindi=False)
+    assert "हिंदी" in build_batch_prompt(terms, depth=1, explain_in_hindi=True)
+
+
+def test_batch_and_single_term_prompts_share_the_answer_structure():
+    terms = [{"label": "Justice", "category": "Core Value"}]
+    single = PROMPT_TEMPLATE_ENGLISH.format(term="Justice", category="Core Value", depth=2)
+
+    assert ANSWER_STRUCTURE_ENGLISH in single
+    assert ANSWER_STRUCTURE_ENGLISH in build_batch_prompt(terms, depth=2, explain_in_hindi=False)
+    assert ANSWER_STRUCTURE_HINDI in PROMPT_TEMPLATE_HINDI
+    assert ANSWER_STRUCTURE_HINDI in build_batch_prompt(terms, depth=2, explain_in_hindi=True)
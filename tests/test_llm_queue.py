@@ -0,0 +1,123 @@
+import threading
+import time
+
+from core.llm_queue import LLMWorkQueue, PRIORITY_BATCH, PRIORITY_FOREGROUND
+
+TIMEOUT = 5
+
+
+def _wait_until(predicate):
+    deadline = time.monotonic() + TIMEOUT
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _blocked_queue(**kwargs):
+    """A single-worker queue whose worker is busy until the returned gate is set."""
+    queue = LLMWorkQueue(max_workers=1, **kwargs)
+    gate = threading.Event()
+    blocker = queue.submit("blocker", gate.wait, TIMEOUT)
+    _wait_until(lambda: blocker.started_at is not None)
+    return queue, gate
+
+
+def test_sessions_are_interleaved_fairly():
+    queue, gate = _blocked_queue()
+    order = []
+
+    jobs = [queue.submit("A", order.append, f"A{i}") for i in range(3)]
+    jobs += [queue.submit("B", order.append, f"B{i}") for i in range(3)]
+    assert [queue.position(job) for job in jobs] == [0, 2, 4, 1, 3, 5]
+
+    gate.set()
+    for job in jobs:
+        assert job.done.wait(TIMEOUT)
+
+    assert order == ["A0", "B0", "A1", "B1", "A2", "B2"]
+
+
+def test_foreground_runs_before_batch():
+    queue, gate = _blocked_queue()
+    order = []
+
+    batch = queue.submit("A", order.append, "batch", priority=PRIORITY_BATCH)
+    foreground = queue.submit("B", order.append, "foreground", priority=PRIORITY_FOREGROUND)
+
+    gate.set()
+    assert batch.done.wait(TIMEOUT) and foreground.done.wait(TIMEOUT)
+    assert order == ["foreground", "batch"]
+
+
+def test_sheds_when_queue_is_full():
+    queue, gate = _blocked_queue(max_depth=3)
+
+    queued = [queue.submit(f"s{i}", str, i) for i in range(3)]
+    shed = queue.submit("s9", str, 9)
+
+    assert not any(job.shed for job in queued)
+    assert shed.shed and shed.done.is_set() and shed.result is None
+    assert queue.metrics()["shed"] == 1
+    gate.set()
+
+
+def test_sheds_sessions_over_their_quota():
+    queue, gate = _blocked_queue(max_pending_per_session=2)
+
+    first, second = queue.submit("A", str, 1), queue.submit("A", str, 2)
+    third = queue.submit("A", str, 3)
+    other = queue.submit("B", str, 4)
+
+    assert not first.shed and not second.shed
+    assert third.shed
+    assert not other.shed
+    gate.set()
+
+
+def test_batch_work_is_shed_at_half_depth():
+    queue, gate = _blocked_queue(max_depth=4)
+
+    queued = [queue.submit(f"s{i}", str, i) for i in range(2)]
+    batch = queue.submit("batch", str, "b", priority=PRIORITY_BATCH)
+    foreground = queue.submit("fg", str, "f")
+
+    assert not any(job.shed for job in queued)
+    assert batch.shed
+    assert not foreground.shed
+    gate.set()
+
+
+def test_shed_job_gets_cached_result():
+    queue = LLMWorkQueue(max_workers=1, max_depth=1)
+    warm = queue.submit("A", str, "cached answer", cache_key="k")
+    assert warm.done.wait(TIMEOUT)
+
+    gate = threading.Event()
+    blocker = queue.submit("blocker", gate.wait, TIMEOUT)
+    _wait_until(lambda: blocker.started_at is not None)
+    queue.submit("B", str, "fills the queue")
+
+    shed = queue.submit("C", str, "never runs", cache_key="k")
+    assert shed.shed
+    assert shed.result == "cached answer"
+    assert queue.metrics()["cache_hits_on_shed"] == 1
+    gate.set()
+
+
+def test_none_result_and_exceptions_count_as_failed():
+    queue = LLMWorkQueue(max_workers=1)
+
+    def boom():
+        raise ValueError("bug")
+
+    empty = queue.submit("A", lambda: None, cache_key="empty")
+    broken = queue.submit("A", boom)
+    ok = queue.submit("A", str, "fine")
+    for job in (empty, broken, ok):
+        assert job.done.wait(TIMEOUT)
+
+    assert isinstance(broken.error, ValueError)
+    assert queue.cache_get("empty") is None
+    metrics = queue.metrics()
+    assert metrics["failed"] == 2
+    assert metrics["completed"] == 1
@@ -0,0 +1,91 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.preamble_data import PREAMBLE_TEXT
+from core.similarity import (
+    TERM_LABELS,
+    build_tfidf_matrix,
+    compare_with_india,
+    format_comparison_facts,
+    keyword_presence_matrix,
+)
+
+THEOCRATIC_TEXT = (
+    "Wherein the principles of democracy, freedom, equality, tolerance and social justice "
+    "as enunciated by Islam shall be fully observed; Islam shall be the State religion, "
+    "and the faith and belief of the people shall guide the unity of the Nation."
+)
+
+US_TEXT = (
+    "We the People of the United States, in Order to form a more perfect Union, establish "
+    "Justice, insure domestic Tranquility, provide for the common defence, promote the "
+    "general Welfare, and secure the Blessings of Liberty to ourselves and our Posterity, "
+    "do ordain and establish this Constitution for the United States of America."
+)
+
+
+def _values(text):
+    row = keyword_presence_matrix([text])[0]
+    return {label for label, hit in zip(TERM_LABELS, row) if hit}
+
+
+def test_indian_preamble_mentions_every_value():
+    assert _values(PREAMBLE_TEXT) == set(TERM_LABELS)
+
+
+def test_generic_words_do_not_count_as_socialist_or_secular():
+    values = _values(THEOCRATIC_TEXT)
+    assert "Socialist" not in values
+    assert "Secular" not in values
+    assert "Fraternity" not in values
+    assert {"Democratic", "Liberty", "Equality", "Justice"} <= values
+
+
+def test_state_religion_negates_secular():
+    assert "Secular" in _values("A secular and democratic state.")
+    assert "Secular" not in _values("A secular people, but Islam is the state religion.")
+
+
+def test_denied_state_religion_keeps_secular():
+    assert "Secular" in _values("A secular republic with no state religion.")
+    assert "Secular" in _values("The State is secular and shall have no official religion.")
+
+
+def test_us_preamble_values():
+    assert _values(US_TEXT) == {"Justice", "Liberty"}
+
+
+def test_tfidf_rows_are_unit_length():
+    matrix, vocab = build_tfidf_matrix([PREAMBLE_TEXT, US_TEXT, ""])
+    norms = np.linalg.norm(matrix, axis=1)
+    assert matrix.shape == (3, len(vocab))
+    assert np.allclose(norms[:2], 1.0)
+    assert norms[2] == 0.0
+
+
+def test_compare_with_india_batches_countries():
+    result = compare_with_india({"India": PREAMBLE_TEXT, "USA": US_TEXT, "Pakistan": THEOCRATIC_TEXT})
+
+    assert list(result) == ["India", "USA", "Pakistan"]
+    assert result["India"]["similarity"] == pytest.approx(1.0)
+    assert result["India"]["missing_values"] == {}
+    assert 0.0 < result["USA"]["similarity"] < 1.0
+
+    usa = result["USA"]
+    assert usa["shared_values"] == {"Core Value": ["Justice", "Liberty"]}
+    assert usa["missing_values"]["Foundational"] == ["Sovereign", "Socialist", "Secular", "Democratic", "Republic"]
+    assert usa["value_overlap"] == pytest.approx(2 / 9)
+
+    assert "Secular" in result["Pakistan"]["missing_values"]["Foundational"]
+
+
+def test_compare_with_india_empty():
+    assert compare_with_india({}) == {}
+
+
+def test_format_comparison_facts():
+    comparison = compare_with_india({"USA": US_TEXT})["USA"]
+    facts = format_comparison_facts("USA", comparison)
+    assert "Core Value: Justice, Liberty" in facts
+    assert "not mentioned by USA: Foundational: Sovereign, Socialist, Secular, Democratic, Republic" in facts